@@ -2,14 +2,26 @@
 # Project  : Financial Transaction Risk & Fraud Pattern Analysis
 # Dataset  : Kaggle Credit Card Fraud Detection (creditcard.csv)
 # Author   : Deepak Dwivedi
-# Tool     : Python 3.x | Pandas | Matplotlib | Seaborn
+# Tool     : Python 3.x | Pandas | PyArrow | Matplotlib | Seaborn
 # ============================================================
 
 # ── CELL 1: Import Libraries ────────────────────────────────
+import os
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import matplotlib
+
+# EDA_RENDER=0 skips writing/showing charts (batch runs) and selects the
+# non-GUI Agg backend before pyplot is imported
+RENDER = os.environ.get('EDA_RENDER', '1') == '1'
+if not RENDER:
+    matplotlib.use('Agg')
+    matplotlib.rcParams['figure.max_open_warning'] = 0
+
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
+import matplotlib.cbook as cbook
 import seaborn as sns
 import warnings
 
@@ -21,7 +33,41 @@ print("✅ Libraries loaded successfully.")
 
 
 # ── CELL 2: Load Dataset ────────────────────────────────────
-df = pd.read_csv("creditcard.csv")
+# Explicit compact dtypes: float32 features/amount, int8 target.
+# Time stays float64 so its describe() mean/std keep full precision.
+dtypes = {f'V{i}': 'float32' for i in range(1, 29)} | {'Time': 'float64', 'Amount': 'float32', 'Class': 'int8'}
+
+# Parse the CSV once with the multi-threaded PyArrow reader, then reload the
+# typed Parquet copy on later runs. The cache is rebuilt when the CSV is newer,
+# the file is unreadable, or its columns/dtypes no longer match `dtypes`. It is
+# written under a temp name so an interrupted run never leaves a truncated cache.
+csv_path, cache_path = "creditcard.csv", "creditcard.parquet"
+df = None
+if os.path.exists(cache_path) and (not os.path.exists(csv_path)
+                                   or os.path.getmtime(cache_path) >= os.path.getmtime(csv_path)):
+    try:
+        cached = pd.read_parquet(cache_path)
+    except (OSError, pa.ArrowInvalid):
+        print(f"⚠️  {cache_path} is unreadable — rebuilding it from {csv_path}.")
+    else:
+        if cached.dtypes.astype(str).to_dict() == dtypes:
+            df = cached
+        else:
+            print(f"⚠️  {cache_path} schema differs from the expected dtypes — rebuilding it from {csv_path}.")
+if df is None:
+    df = pd.read_csv(csv_path, dtype=dtypes, engine='pyarrow')
+    tmp_path = cache_path + ".tmp"
+    try:
+        df.to_parquet(tmp_path, compression='zstd', index=False)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Raw column arrays and the fraud mask, computed once and reused below
+amount_np = df['Amount'].to_numpy()
+class_np  = df['Class'].to_numpy()
+is_fraud  = class_np.astype(bool)
 
 print(f"📦 Dataset Shape : {df.shape}")
 print(f"📋 Columns       : {list(df.columns)}")
@@ -38,7 +84,11 @@ print("\n")
 print("=" * 55)
 print("  DESCRIPTIVE STATISTICS — AMOUNT & TIME")
 print("=" * 55)
-print(df[['Time', 'Amount', 'Class']].describe().round(4))
+# Describe in float64. Amounts are whole cents in the CSV, so rounding the upcast
+# values to 2 dp restores them exactly (float32 stores 25691.16 as 25691.16015625)
+desc_cols = df[['Time', 'Amount', 'Class']].astype('float64')
+desc_cols['Amount'] = desc_cols['Amount'].round(2)
+print(desc_cols.describe().round(4))
 
 
 # ── CELL 4: Missing Value & Duplicate Check ─────────────────
@@ -51,17 +101,24 @@ print(missing[missing > 0] if missing.sum() > 0 else "✅ No missing values foun
 print("\n" + "=" * 55)
 print("  DUPLICATE ROW CHECK")
 print("=" * 55)
-dupes = df.duplicated().sum()
+# Distinct rows via Arrow's hash group-by over all columns. Matches
+# df.duplicated().sum() for this data, but float keys can differ: e.g. Arrow
+# keeps 0.0 and -0.0 apart where pandas treats them as equal.
+distinct_rows = pa.Table.from_pandas(df, preserve_index=False).group_by(list(df.columns)).aggregate([]).num_rows
+dupes = len(df) - distinct_rows
 print(f"{'⚠️  Duplicates found: ' + str(dupes) if dupes > 0 else '✅ No duplicate rows found.'}")
 
 
 # ── CELL 5: Class Distribution — Fraud vs. Legitimate ───────
-fraud_counts   = df['Class'].value_counts()
-fraud_pct      = df['Class'].value_counts(normalize=True) * 100
+# Class is 0/1, so a single sum gives both counts
+n_fraud        = int(class_np.sum())
+n_legit        = class_np.size - n_fraud
+pct_fraud      = n_fraud * 100.0 / class_np.size
+fraud_counts   = np.array([n_legit, n_fraud])
 fraud_summary  = pd.DataFrame({
     'Transaction Type' : ['Legitimate', 'Fraudulent'],
-    'Count'            : [fraud_counts[0], fraud_counts[1]],
-    'Percentage (%)'   : [round(fraud_pct[0], 4), round(fraud_pct[1], 4)]
+    'Count'            : fraud_counts,
+    'Percentage (%)'   : [round(n_legit * 100.0 / class_np.size, 4), round(pct_fraud, 4)]
 })
 print("=" * 55)
 print("  FRAUD vs. LEGITIMATE DISTRIBUTION")
@@ -72,90 +129,106 @@ print(fraud_summary.to_string(index=False))
 fig, axes = plt.subplots(1, 2, figsize=(13, 5))
 colors = ['#2196F3', '#F44336']
 
-axes[0].bar(['Legitimate', 'Fraudulent'], fraud_counts.values, color=colors, edgecolor='black', width=0.5)
+axes[0].bar(['Legitimate', 'Fraudulent'], fraud_counts, color=colors, edgecolor='black', width=0.5)
 axes[0].set_title('Transaction Count: Legitimate vs. Fraudulent', fontweight='bold')
 axes[0].set_ylabel('Number of Transactions')
-for bar, val in zip(axes[0].patches, fraud_counts.values):
+for bar, val in zip(axes[0].patches, fraud_counts):
     axes[0].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1000,
                  f'{val:,}', ha='center', fontweight='bold')
 
-axes[1].pie(fraud_counts.values, labels=['Legitimate', 'Fraudulent'],
+axes[1].pie(fraud_counts, labels=['Legitimate', 'Fraudulent'],
             autopct='%1.3f%%', colors=colors, startangle=90,
             wedgeprops={'edgecolor': 'white', 'linewidth': 2})
 axes[1].set_title('Class Distribution (Proportion)', fontweight='bold')
 
 plt.suptitle('Class Imbalance: Credit Card Fraud Dataset', fontsize=14, fontweight='bold')
 plt.tight_layout()
-plt.savefig('outputs/01_class_distribution.png', dpi=150, bbox_inches='tight')
-plt.show()
+if RENDER:
+    plt.savefig('outputs/01_class_distribution.png', dpi=150, bbox_inches='tight')
+    plt.show()
+plt.close(fig)
 
 
 # ── CELL 6: Transaction Amount Analysis ─────────────────────
-legit_amt = df[df['Class'] == 0]['Amount']
-fraud_amt = df[df['Class'] == 1]['Amount']
+# Upcast the slices (rounded back to whole cents) so the reported statistics
+# are computed on the exact CSV amounts in float64
+legit_amt = amount_np[~is_fraud].astype(np.float64).round(2)
+fraud_amt = amount_np[is_fraud].astype(np.float64).round(2)
 
 print("=" * 55)
 print("  AMOUNT STATISTICS: LEGITIMATE vs. FRAUDULENT")
 print("=" * 55)
+# All six statistics over the upcast slices above — each row is read once and no
+# further copy of Amount is made; an absent class yields count 0 / NaN stats
 amount_stats = pd.DataFrame({
-    'Metric'      : ['Count', 'Mean ($)', 'Median ($)', 'Std Dev', 'Min ($)', 'Max ($)'],
-    'Legitimate'  : [len(legit_amt), round(legit_amt.mean(),2), round(legit_amt.median(),2),
-                     round(legit_amt.std(),2), round(legit_amt.min(),2), round(legit_amt.max(),2)],
-    'Fraudulent'  : [len(fraud_amt), round(fraud_amt.mean(),2), round(fraud_amt.median(),2),
-                     round(fraud_amt.std(),2), round(fraud_amt.min(),2), round(fraud_amt.max(),2)]
-})
+    cls: pd.Series(amt).agg(['count', 'mean', 'median', 'std', 'min', 'max'])
+    for cls, amt in ((0, legit_amt), (1, fraud_amt))
+}).reindex(columns=[0, 1]).round(2)
+amount_stats.index   = ['Count', 'Mean ($)', 'Median ($)', 'Std Dev', 'Min ($)', 'Max ($)']
+amount_stats.columns = ['Legitimate', 'Fraudulent']
+amount_stats = amount_stats.rename_axis('Metric').reset_index()
 print(amount_stats.to_string(index=False))
 
 # Visualization — amount distribution
 fig, axes = plt.subplots(1, 2, figsize=(14, 5))
 
-axes[0].hist(legit_amt, bins=60, color='#2196F3', alpha=0.75, edgecolor='black', label='Legitimate')
-axes[0].hist(fraud_amt, bins=60, color='#F44336', alpha=0.75, edgecolor='black', label='Fraudulent')
+# Bin once with NumPy on shared edges, then draw the counts as bars
+edges      = np.histogram_bin_edges(amount_np, bins=60)
+legit_h, _ = np.histogram(legit_amt, bins=edges)
+fraud_h, _ = np.histogram(fraud_amt, bins=edges)
+axes[0].bar(edges[:-1], legit_h, width=np.diff(edges), align='edge', rasterized=True,
+            color='#2196F3', alpha=0.75, edgecolor='black', label='Legitimate')
+axes[0].bar(edges[:-1], fraud_h, width=np.diff(edges), align='edge', rasterized=True,
+            color='#F44336', alpha=0.75, edgecolor='black', label='Fraudulent')
 axes[0].set_title('Transaction Amount Distribution', fontweight='bold')
 axes[0].set_xlabel('Amount (USD)')
 axes[0].set_ylabel('Frequency')
 axes[0].legend()
 axes[0].xaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'${x:,.0f}'))
 
-# Box plot comparison
-axes[1].boxplot([legit_amt, fraud_amt], labels=['Legitimate', 'Fraudulent'],
-                patch_artist=True,
-                boxprops=dict(facecolor='#E3F2FD'),
-                medianprops=dict(color='#F44336', linewidth=2))
+# Box plot comparison — quartiles precomputed, bxp only draws them
+box_stats = cbook.boxplot_stats([legit_amt, fraud_amt], labels=['Legitimate', 'Fraudulent'])
+axes[1].bxp(box_stats, patch_artist=True,
+            boxprops=dict(facecolor='#E3F2FD'),
+            medianprops=dict(color='#F44336', linewidth=2))
 axes[1].set_title('Amount Spread: Boxplot Comparison', fontweight='bold')
 axes[1].set_ylabel('Transaction Amount (USD)')
 axes[1].yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _: f'${x:,.0f}'))
 
 plt.suptitle('Transaction Amount Analysis', fontsize=14, fontweight='bold')
 plt.tight_layout()
-plt.savefig('outputs/02_amount_analysis.png', dpi=150, bbox_inches='tight')
-plt.show()
+if RENDER:
+    plt.savefig('outputs/02_amount_analysis.png', dpi=150, bbox_inches='tight')
+    plt.show()
+plt.close(fig)
 
 
 # ── CELL 7: Amount Segmentation (Risk Buckets) ──────────────
-def assign_risk_band(amount):
-    if amount < 10:
-        return '1. Micro (< $10)'
-    elif amount < 100:
-        return '2. Low ($10-$99)'
-    elif amount < 500:
-        return '3. Medium ($100-$499)'
-    elif amount < 1000:
-        return '4. High ($500-$999)'
-    elif amount < 5000:
-        return '5. Premium ($1K-$4,999)'
-    else:
-        return '6. Very High (>= $5K)'
-
-df['amount_band'] = df['Amount'].apply(assign_risk_band)
-
-band_summary = df.groupby('amount_band').agg(
-    total_transactions=('Class', 'count'),
-    fraud_count=('Class', 'sum'),
-    total_amount=('Amount', 'sum')
-).reset_index()
+band_edges  = np.array([-np.inf, 10, 100, 500, 1000, 5000, np.inf])
+band_labels = ['1. Micro (< $10)', '2. Low ($10-$99)', '3. Medium ($100-$499)',
+               '4. High ($500-$999)', '5. Premium ($1K-$4,999)', '6. Very High (>= $5K)']
+
+# Vectorized binning (left-closed, matching the SQL CASE boundaries)
+df['amount_band'] = pd.cut(df['Amount'].to_numpy(), bins=band_edges, labels=band_labels, right=False)
+
+# Band tallies straight from bincount on the integer category codes.
+# Weighted sums come back as float64, so dollar totals keep their cents.
+band_codes = df['amount_band'].cat.codes.to_numpy()
+n_bands    = len(band_labels)
+band_cnt   = np.bincount(band_codes, minlength=n_bands)
+band_fraud = np.bincount(band_codes[is_fraud], minlength=n_bands)
+band_amt   = np.bincount(band_codes, weights=amount_np, minlength=n_bands)
+band_exp   = np.bincount(band_codes[is_fraud], weights=amount_np[is_fraud], minlength=n_bands)
+
+band_summary = pd.DataFrame({
+    'amount_band'        : band_labels,
+    'total_transactions' : band_cnt,
+    'fraud_count'        : band_fraud,
+    'total_amount'       : band_amt,
+    'fraud_exposure'     : band_exp
+})
+band_summary = band_summary[band_summary['total_transactions'] > 0].reset_index(drop=True)
 band_summary['fraud_rate_pct'] = (band_summary['fraud_count'] / band_summary['total_transactions'] * 100).round(2)
-band_summary['fraud_exposure'] = df[df['Class']==1].groupby('amount_band')['Amount'].sum().values
 
 print("=" * 65)
 print("  FRAUD RATE BY TRANSACTION AMOUNT BAND")
@@ -174,16 +247,31 @@ for bar in bars:
     ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
             f'{bar.get_height():.2f}%', ha='center', fontsize=10, fontweight='bold')
 plt.tight_layout()
-plt.savefig('outputs/03_fraud_rate_by_amount_band.png', dpi=150, bbox_inches='tight')
-plt.show()
+if RENDER:
+    plt.savefig('outputs/03_fraud_rate_by_amount_band.png', dpi=150, bbox_inches='tight')
+    plt.show()
+plt.close(fig)
 
 
 # ── CELL 8: Time-Based Fraud Analysis ───────────────────────
-df['hour_of_day'] = (df['Time'] / 3600).astype(int) % 24
-
-hourly = df.groupby(['hour_of_day', 'Class']).size().unstack(fill_value=0).reset_index()
-hourly.columns = ['hour', 'legitimate', 'fraudulent']
-hourly['fraud_rate'] = (hourly['fraudulent'] / (hourly['legitimate'] + hourly['fraudulent']) * 100).round(4)
+# Integer seconds -> hour of day; int8 keeps the column at 1 byte per row
+time_s = df['Time'].to_numpy().astype(np.int64)
+df['hour_of_day'] = (time_s // 3600 % 24).astype(np.int8)
+hour = df['hour_of_day'].to_numpy()
+
+# 24-slot counts straight from bincount — no groupby hash table needed
+total_by_hr = np.bincount(hour, minlength=24)
+fraud_by_hr = np.bincount(hour[is_fraud], minlength=24)
+legit_by_hr = total_by_hr - fraud_by_hr
+# Hours with no transactions get a 0% rate instead of a silent 0/0 NaN
+fraud_rate_by_hr = np.divide(fraud_by_hr * 100.0, total_by_hr, out=np.zeros(24), where=total_by_hr > 0)
+
+hourly = pd.DataFrame({
+    'hour'       : np.arange(24),
+    'legitimate' : legit_by_hr,
+    'fraudulent' : fraud_by_hr,
+    'fraud_rate' : fraud_rate_by_hr.round(4)
+})
 
 fig, axes = plt.subplots(2, 1, figsize=(14, 9))
 
@@ -209,57 +297,76 @@ axes[1].set_xticks(range(0, 24))
 
 plt.suptitle('Time-Based Fraud Pattern Analysis', fontsize=14, fontweight='bold')
 plt.tight_layout()
-plt.savefig('outputs/04_time_fraud_analysis.png', dpi=150, bbox_inches='tight')
-plt.show()
+if RENDER:
+    plt.savefig('outputs/04_time_fraud_analysis.png', dpi=150, bbox_inches='tight')
+    plt.show()
+plt.close(fig)
+
+# Top-5 hours by partial selection: keep every hour tied with the 5th-largest
+# rate, then stable-sort those few so ties go to the earlier hour (as nlargest)
+hour_rate = hourly['fraud_rate'].to_numpy()
+cand_idx  = np.flatnonzero(hour_rate >= hour_rate[np.argpartition(hour_rate, -5)[-5]])
+top_idx   = cand_idx[np.argsort(-hour_rate[cand_idx], kind='stable')][:5]
+top5      = hourly.iloc[top_idx][['hour', 'fraudulent', 'fraud_rate']]
 
 print("📊 Peak fraud hours:")
-print(hourly.nlargest(5, 'fraud_rate')[['hour', 'fraudulent', 'fraud_rate']].to_string(index=False))
+print(top5.to_string(index=False))
 
 
 # ── CELL 9: Correlation Heatmap (PCA Features) ──────────────
 # Only V1–V10 shown for readability; extend to V28 as needed
 feature_cols = [f'V{i}' for i in range(1, 11)] + ['Amount', 'Class']
-corr_matrix  = df[feature_cols].corr()
+# Data has no NaNs (Cell 4), so np.corrcoef can run on the raw array directly
+corr_arr     = np.corrcoef(df[feature_cols].to_numpy(dtype=np.float32).T)
+corr_matrix  = pd.DataFrame(corr_arr, index=feature_cols, columns=feature_cols)
 
-plt.figure(figsize=(12, 8))
+fig = plt.figure(figsize=(12, 8))
 mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
 sns.heatmap(corr_matrix, mask=mask, annot=True, fmt='.2f',
             cmap='RdBu_r', center=0, linewidths=0.5,
-            cbar_kws={'shrink': 0.8})
+            cbar_kws={'shrink': 0.8}, rasterized=True)
 plt.title('Correlation Heatmap: Key Features vs. Fraud Class', fontweight='bold', fontsize=13)
 plt.tight_layout()
-plt.savefig('outputs/05_correlation_heatmap.png', dpi=150, bbox_inches='tight')
-plt.show()
+if RENDER:
+    plt.savefig('outputs/05_correlation_heatmap.png', dpi=150, bbox_inches='tight')
+    plt.show()
+plt.close(fig)
 
 
 # ── CELL 10: Key Business Insights Summary ──────────────────
-total_txns        = len(df)
-total_fraud       = df['Class'].sum()
-fraud_rate        = round(total_fraud / total_txns * 100, 4)
-total_volume      = round(df['Amount'].sum(), 2)
-fraud_exposure    = round(df[df['Class']==1]['Amount'].sum(), 2)
-avg_fraud_amt     = round(df[df['Class']==1]['Amount'].mean(), 2)
-avg_legit_amt     = round(df[df['Class']==0]['Amount'].mean(), 2)
-peak_hour         = hourly.loc[hourly['fraud_rate'].idxmax(), 'hour']
+# Reuse totals already reduced in Cells 5, 7 and 8 instead of rescanning columns
+volume_total      = band_summary['total_amount'].sum()
+exposure_total    = band_summary['fraud_exposure'].sum()
+total_txns        = class_np.size
+total_fraud       = n_fraud
+fraud_rate        = round(pct_fraud, 4)
+total_volume      = round(volume_total, 2)
+fraud_exposure    = round(exposure_total, 2)
+avg_fraud_amt     = round(exposure_total / n_fraud, 2)
+avg_legit_amt     = round((volume_total - exposure_total) / n_legit, 2)
+peak_hour         = top5['hour'].iloc[0]
 highest_band      = band_summary.loc[band_summary['fraud_rate_pct'].idxmax(), 'amount_band']
 
-print("=" * 60)
-print("  📊  EXECUTIVE RISK SUMMARY — FRAUD ANALYSIS")
-print("=" * 60)
-print(f"  Total Transactions     : {total_txns:,}")
-print(f"  Total Fraudulent Cases : {total_fraud:,}")
-print(f"  Overall Fraud Rate     : {fraud_rate}%")
-print(f"  Total Transaction Vol  : ${total_volume:,.2f}")
-print(f"  Total Fraud Exposure   : ${fraud_exposure:,.2f}")
-print(f"  Avg Fraud Amount       : ${avg_fraud_amt:,.2f}")
-print(f"  Avg Legitimate Amount  : ${avg_legit_amt:,.2f}")
-print(f"  Peak Fraud Hour        : {peak_hour}:00")
-print(f"  Highest Risk Band      : {highest_band}")
-print("=" * 60)
-print("\n📌 KEY BUSINESS INSIGHTS:")
-print(f"  1. Only {fraud_rate}% of transactions are fraudulent — severe class imbalance.")
-print(f"  2. Fraudulent transactions average ${avg_fraud_amt} vs. ${avg_legit_amt} for legitimate ones.")
-print(f"  3. Total financial exposure from fraud: ${fraud_exposure:,.2f}.")
-print(f"  4. Peak fraud activity occurs around hour {peak_hour}:00 (late-night/early-morning window).")
-print(f"  5. Amount band '{highest_band}' shows the highest fraud concentration.")
-print("\n✅ EDA Complete. Proceed to Power BI Dashboard or ML Modelling.")
+report = "\n".join([
+    "=" * 60,
+    "  📊  EXECUTIVE RISK SUMMARY — FRAUD ANALYSIS",
+    "=" * 60,
+    f"  Total Transactions     : {total_txns:,}",
+    f"  Total Fraudulent Cases : {total_fraud:,}",
+    f"  Overall Fraud Rate     : {fraud_rate}%",
+    f"  Total Transaction Vol  : ${total_volume:,.2f}",
+    f"  Total Fraud Exposure   : ${fraud_exposure:,.2f}",
+    f"  Avg Fraud Amount       : ${avg_fraud_amt:,.2f}",
+    f"  Avg Legitimate Amount  : ${avg_legit_amt:,.2f}",
+    f"  Peak Fraud Hour        : {peak_hour}:00",
+    f"  Highest Risk Band      : {highest_band}",
+    "=" * 60,
+    "\n📌 KEY BUSINESS INSIGHTS:",
+    f"  1. Only {fraud_rate}% of transactions are fraudulent — severe class imbalance.",
+    f"  2. Fraudulent transactions average ${avg_fraud_amt} vs. ${avg_legit_amt} for legitimate ones.",
+    f"  3. Total financial exposure from fraud: ${fraud_exposure:,.2f}.",
+    f"  4. Peak fraud activity occurs around hour {peak_hour}:00 (late-night/early-morning window).",
+    f"  5. Amount band '{highest_band}' shows the highest fraud concentration.",
+    "\n✅ EDA Complete. Proceed to Power BI Dashboard or ML Modelling."
+])
+print(report)